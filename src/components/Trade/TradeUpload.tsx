@@ -135,11 +135,7 @@ export default function TradeUpload() {
       setProgress(20)
       setProcessingStep('Parsing CSV data...')
       
-      // Split content into lines to see structure
-      const lines = content.trim().split(/\r?\n/)
-      console.log('Total lines in CSV:', lines.length)
-      console.log('First 3 lines:', lines.slice(0, 3))
-      
+      // The content is split into lines once, inside processCSV
       try {
         console.log('About to call processCSV...')
         processCSV(content)
@@ -1,5 +1,6 @@
 import { parse } from 'csv-parse/sync'
 import { Trade } from './store'
+import { getTradeSide } from './csvHelpers'
 
 export async function parseCSV(content: string): Promise<Trade[]> {
   try {
@@ -77,7 +78,9 @@ export async function parseCSV(content: string): Promise<Trade[]> {
         } : undefined
       }
 
-      if (action.includes('buy')) {
+      const side = getTradeSide(action)
+
+      if (side === 'buy') {
         const shares = parseFloat(line['No. of shares'] || '0')
         const price = parseFloat(line['Price / share'] || '0')
 
@@ -99,7 +102,7 @@ export async function parseCSV(content: string): Promise<Trade[]> {
 
           profitLoss: 0
         })
-      } else if (action.includes('sell')) {
+      } else if (side === 'sell') {
         const shares = parseFloat(line['No. of shares'] || '0')
         const sellPrice = parseFloat(line['Price / share'] || '0')
 
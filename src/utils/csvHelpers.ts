@@ -0,0 +1,56 @@
+// Shared CSV parsing helpers for the Trading212 and IBKR importers
+
+// Parse a numeric CSV field, stripping thousands separators and whitespace.
+// Plain numbers (the common case) skip the replace and its string copy.
+export const parseNumericField = (value: string | undefined): number => {
+  if (!value) return NaN
+  return parseFloat(/[,\s]/.test(value) ? value.replace(/[,\s]/g, '') : value)
+}
+
+// Helper function to parse CSV line handling quotes and commas.
+// Fields are sliced out of the line between delimiters rather than built up
+// one character at a time; quote characters are dropped as before.
+export const parseCSVLine = (line: string): string[] => {
+  // Fast path: most export lines have no quoted fields, so the native split
+  // gives the same result without scanning character by character
+  if (line.indexOf('"') === -1) {
+    return line.split(',').map(field => field.trim())
+  }
+
+  const result: string[] = []
+  let current = ''
+  let segmentStart = 0
+  let inQuotes = false
+  
+  for (let i = 0; i < line.length; i++) {
+    const charCode = line.charCodeAt(i)
+    
+    if (charCode === 34) { // '"'
+      current += line.slice(segmentStart, i)
+      segmentStart = i + 1
+      inQuotes = !inQuotes
+    } else if (charCode === 44 && !inQuotes) { // ','
+      result.push((current + line.slice(segmentStart, i)).trim())
+      current = ''
+      segmentStart = i + 1
+    }
+  }
+  
+  result.push((current + line.slice(segmentStart)).trim())
+  return result
+}
+
+// Trade side per raw action string (e.g. "Market buy", "Limit sell").
+// An import only has a handful of distinct actions, so each one is
+// lowercased and classified once and then served from the cache.
+const tradeSideCache = new Map<string, 'buy' | 'sell' | null>()
+
+export const getTradeSide = (type: string): 'buy' | 'sell' | null => {
+  let side = tradeSideCache.get(type)
+  if (side === undefined) {
+    const lowerType = type.toLowerCase()
+    side = lowerType.includes('buy') ? 'buy' : lowerType.includes('sell') ? 'sell' : null
+    tradeSideCache.set(type, side)
+  }
+  return side
+}
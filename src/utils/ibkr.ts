@@ -1,9 +1,25 @@
 import { Trade } from './store';
+import { parseCSVLine, parseNumericField } from './csvHelpers';
 
 export interface IBKRTrade extends Trade {
     ibkrOrderId?: string;
 }
 
+/**
+ * Column positions for the fields read from each trade line.
+ * Each field lists its candidate columns in fallback order.
+ */
+interface IBKRColumns {
+    symbol: number[];
+    date: number[];
+    quantity: number[];
+    price: number[];
+    proceeds: number[];
+    commission: number[];
+    buySell: number[];
+    currency: number[];
+}
+
 export class IBKRParser {
     /**
      * Parses IBKR Activity Statement (Flex Query) CSV content
@@ -22,11 +38,11 @@ export class IBKRParser {
         // Strategy: Find the header line for Trades to map columns, then parse data lines.
 
         let headers: string[] = [];
-        let headerMap: Record<string, number> = {};
+        let columns: IBKRColumns | null = null;
         let isTradeSection = false;
 
         for (const line of lines) {
-            const parts = line.split(',').map(p => p.trim().replace(/"/g, ''));
+            const parts = parseCSVLine(line);
 
             if (parts.length < 2) continue;
 
@@ -35,17 +51,18 @@ export class IBKRParser {
 
             if (type === 'Trades' && level === 'Header') {
                 headers = parts;
-                headerMap = {};
+                const headerMap: Record<string, number> = {};
                 headers.forEach((h, i) => {
                     headerMap[h] = i;
                 });
+                columns = this.resolveColumns(headerMap);
                 isTradeSection = true;
                 continue;
             }
 
-            if (type === 'Trades' && level === 'Data' && isTradeSection) {
+            if (type === 'Trades' && level === 'Data' && isTradeSection && columns) {
                 try {
-                    const trade = this.parseTradeLine(parts, headerMap);
+                    const trade = this.parseTradeLine(parts, columns);
                     if (trade) {
                         trades.push(trade);
                     }
@@ -81,13 +98,16 @@ export class IBKRParser {
         
         // Parse header row
         const headerLine = lines[0];
-        const headers = headerLine.split(',').map(h => h.trim().replace(/"/g, ''));
+        const headers = parseCSVLine(headerLine);
         
         const headerMap: Record<string, number> = {};
         headers.forEach((h, i) => {
             headerMap[h] = i;
         });
 
+        const columns = this.resolveColumns(headerMap);
+        const dateTimeIdx = headerMap['DateTime'] || headerMap['Date/Time'];
+
         console.log('Simple CSV headers:', headers);
 
         // Parse data rows
@@ -96,10 +116,9 @@ export class IBKRParser {
             if (!line.trim()) continue;
 
             try {
-                const parts = line.split(',').map(p => p.trim().replace(/"/g, ''));
+                const parts = parseCSVLine(line);
                 
                 // Skip rows with empty DateTime (summary rows)
-                const dateTimeIdx = headerMap['DateTime'] || headerMap['Date/Time'];
                 if (dateTimeIdx !== undefined) {
                     const dateTimeValue = parts[dateTimeIdx];
                     if (!dateTimeValue || dateTimeValue.trim() === '') {
@@ -108,7 +127,7 @@ export class IBKRParser {
                     }
                 }
 
-                const trade = this.parseTradeLine(parts, headerMap);
+                const trade = this.parseTradeLine(parts, columns);
                 if (trade) {
                     trades.push(trade);
                 }
@@ -126,21 +145,44 @@ export class IBKRParser {
         return uniqueTrades;
     }
 
-    private static parseTradeLine(parts: string[], headerMap: Record<string, number>): Trade | null {
-        // Helper to get value by column name
-        const get = (col: string) => {
-            const idx = headerMap[col];
-            return idx !== undefined && idx < parts.length ? parts[idx] : null;
+    /**
+     * Resolve the column positions for a header row once, so data lines
+     * are read by index rather than by name
+     */
+    private static resolveColumns(headerMap: Record<string, number>): IBKRColumns {
+        const find = (...names: string[]) => names
+            .map(name => headerMap[name])
+            .filter((idx): idx is number => idx !== undefined);
+
+        return {
+            symbol: find('Symbol'),
+            date: find('Date/Time', 'DateTime'), // Support both "Date/Time" and "DateTime"
+            quantity: find('Quantity'),
+            price: find('T. Price', 'Price', 'TradePrice'),
+            proceeds: find('Proceeds'),
+            commission: find('Comm/Fee', 'IBCommission'),
+            buySell: find('Buy/Sell'), // "BUY" or "SELL"
+            currency: find('Currency'),
+        };
+    }
+
+    private static parseTradeLine(parts: string[], columns: IBKRColumns): Trade | null {
+        // Helper to get the first non-empty value among a field's candidate columns
+        const get = (indices: number[]) => {
+            for (const idx of indices) {
+                if (idx < parts.length && parts[idx]) return parts[idx];
+            }
+            return null;
         };
 
-        const symbol = get('Symbol');
-        const dateStr = get('Date/Time') || get('DateTime'); // Support both "Date/Time" and "DateTime"
-        const quantityStr = get('Quantity');
-        const priceStr = get('T. Price') || get('Price') || get('TradePrice');
-        const proceedsStr = get('Proceeds');
-        const commStr = get('Comm/Fee') || get('IBCommission');
-        const buySell = get('Buy/Sell'); // "BUY" or "SELL"
-        const currency = get('Currency') || 'USD'; // Default to USD if not specified
+        const symbol = get(columns.symbol);
+        const dateStr = get(columns.date);
+        const quantityStr = get(columns.quantity);
+        const priceStr = get(columns.price);
+        const proceedsStr = get(columns.proceeds);
+        const commStr = get(columns.commission);
+        const buySell = get(columns.buySell);
+        const currency = get(columns.currency) || 'USD'; // Default to USD if not specified
 
         // Skip rows with missing required fields
         if (!symbol || !quantityStr || !priceStr || !dateStr) return null;
@@ -171,10 +213,10 @@ export class IBKRParser {
         
         console.log(`✅ Parsed date: "${date}" for ${symbol}`)
 
-        const quantity = Math.abs(parseFloat(quantityStr));
-        const price = Math.abs(parseFloat(priceStr));
-        const proceeds = parseFloat(proceedsStr || '0');
-        const commission = Math.abs(parseFloat(commStr || '0'));
+        const quantity = Math.abs(parseNumericField(quantityStr));
+        const price = Math.abs(parseNumericField(priceStr));
+        const proceeds = parseNumericField(proceedsStr || '0');
+        const commission = Math.abs(parseNumericField(commStr || '0'));
 
         // Determine type
         let type: 'BUY' | 'SELL' = 'BUY';
@@ -183,7 +225,7 @@ export class IBKRParser {
         } else {
             // Infer from quantity if Buy/Sell column missing (positive = buy, negative = sell? No, usually quantity is signed)
             // Actually in "Trades" section, Quantity is often signed.
-            const rawQty = parseFloat(quantityStr);
+            const rawQty = parseNumericField(quantityStr);
             type = rawQty > 0 ? 'BUY' : 'SELL';
         }
 
@@ -1,6 +1,7 @@
 'use client'
 
 import { create } from 'zustand'
+import { getTradeSide, parseCSVLine, parseNumericField } from './csvHelpers'
 
 export interface TradeJournal {
   notes: string
@@ -97,33 +98,47 @@ const analyzePositions = (trades: Trade[]): Trade[] => {
   console.log('=== Position Analysis Debug ===')
   console.log(`📊 Total trades to analyze: ${trades.length}`)
   
-  const positions: Record<string, { bought: number; sold: number; trades: Trade[]; buyTrades: Trade[]; sellTrades: Trade[] }> = {}
+  const positions: Record<string, { bought: number; sold: number; trades: Trade[]; buyTrades: Trade[]; sellTrades: Trade[]; openBuyIds: Set<string> }> = {}
   
-  // Group trades by symbol
+  // Group trades by symbol, resolving each symbol's bucket once per trade
   trades.forEach(trade => {
-    if (!positions[trade.symbol]) {
-      positions[trade.symbol] = { bought: 0, sold: 0, trades: [], buyTrades: [], sellTrades: [] }
+    let position = positions[trade.symbol]
+    if (!position) {
+      position = { bought: 0, sold: 0, trades: [], buyTrades: [], sellTrades: [], openBuyIds: new Set() }
+      positions[trade.symbol] = position
     }
-    positions[trade.symbol].trades.push(trade)
+    position.trades.push(trade)
     
     // Count quantities bought vs sold
-    const isBuy = trade.type.toLowerCase().includes('buy')
-    const isSell = trade.type.toLowerCase().includes('sell')
+    const side = getTradeSide(trade.type)
     
-    if (isBuy) {
-      positions[trade.symbol].bought += trade.quantity
-      positions[trade.symbol].buyTrades.push(trade)
-    } else if (isSell) {
-      positions[trade.symbol].sold += trade.quantity
-      positions[trade.symbol].sellTrades.push(trade)
+    if (side === 'buy') {
+      position.bought += trade.quantity
+      position.buyTrades.push(trade)
+    } else if (side === 'sell') {
+      position.sold += trade.quantity
+      position.sellTrades.push(trade)
     }
   })
   
+  // Parse each distinct date to epoch milliseconds once, so the sort
+  // comparators below compare numbers instead of constructing Dates
+  const dateTimes = new Map<string, number>()
+  const toTime = (date: string): number => {
+    let time = dateTimes.get(date)
+    if (time === undefined) {
+      time = new Date(date).getTime()
+      dateTimes.set(date, time)
+    }
+    return time
+  }
+  
   // Calculate P&L for SELL trades by matching with BUY trades (FIFO)
   Object.keys(positions).forEach(symbol => {
     const position = positions[symbol]
-    const buyTrades = [...position.buyTrades].sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime())
-    const sellTrades = [...position.sellTrades].sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime())
+    // Sorted in place, oldest first; the open-lot pass below reuses this order
+    const buyTrades = position.buyTrades.sort((a, b) => toTime(a.date) - toTime(b.date))
+    const sellTrades = position.sellTrades.sort((a, b) => toTime(a.date) - toTime(b.date))
     
     console.log(`\n📈 Processing ${symbol}: ${buyTrades.length} BUY trades, ${sellTrades.length} SELL trades`)
     
@@ -212,34 +227,28 @@ const analyzePositions = (trades: Trade[]): Trade[] => {
     })
   }
   
+  // Resolve the open buy lots once per symbol: the most recent buys that
+  // together cover the remaining (bought - sold) shares
+  Object.values(positions).forEach(position => {
+    if (position.bought > position.sold) {
+      // Only mark the most recent buy trades as open for each symbol
+      // This prevents counting all historical buys as open positions.
+      // buyTrades was sorted oldest first during FIFO matching, so walk it backwards
+      const { buyTrades } = position
+      let remainingShares = position.bought - position.sold
+      for (let i = buyTrades.length - 1; i >= 0 && remainingShares > 0; i--) {
+        position.openBuyIds.add(buyTrades[i].id)
+        remainingShares -= buyTrades[i].quantity
+      }
+    }
+  })
+  
   // Mark trades as open or closed
   const analyzedTrades = trades.map(trade => {
     const position = positions[trade.symbol]
     const isPositionOpen = position.bought > position.sold
-    const isBuy = trade.type.toLowerCase().includes('buy')
-    const isSell = trade.type.toLowerCase().includes('sell')
-    
-    // Only mark the most recent buy trades as open for each symbol
-    // This prevents counting all historical buys as open positions
-    const recentBuyTrades = position.trades
-      .filter(t => t.type.toLowerCase().includes('buy'))
-      .sort((a, b) => new Date(b.date).getTime() - new Date(a.date).getTime())
-    
-    let remainingShares = Math.max(0, position.bought - position.sold)
-    let isThisTradeOpen = false
-    
-    if (isBuy && isPositionOpen && remainingShares > 0) {
-      // Find if this trade contributes to the open position
-      for (const buyTrade of recentBuyTrades) {
-        if (remainingShares <= 0) break
-        if (buyTrade.id === trade.id) {
-          isThisTradeOpen = true
-          remainingShares -= trade.quantity
-          break
-        }
-        remainingShares -= buyTrade.quantity
-      }
-    }
+    const isBuy = getTradeSide(trade.type) === 'buy'
+    const isThisTradeOpen = isBuy && isPositionOpen && position.openBuyIds.has(trade.id)
     
     const analyzedTrade = {
       ...trade,
@@ -261,37 +270,58 @@ const analyzePositions = (trades: Trade[]): Trade[] => {
 
 const calculateStats = (trades: Trade[]): TradeStats => {
   // Only calculate stats for closed positions (trades with actual profit/loss)
-  const closedTrades = trades.filter((t) => t.profitLoss !== 0 || !t.isOpen)
-  const profitableTrades = closedTrades.filter((t) => t.profitLoss > 0)
-  const losingTrades = closedTrades.filter((t) => t.profitLoss < 0)
-  const totalProfit = profitableTrades.reduce((sum, t) => sum + t.profitLoss, 0)
-  const totalLoss = Math.abs(losingTrades.reduce((sum, t) => sum + t.profitLoss, 0))
+  // Every aggregate is accumulated in one linear pass over the trades
+  let closedCount = 0
+  let profitableCount = 0
+  let losingCount = 0
+  let totalProfit = 0
+  let totalLoss = 0
+  let netProfit = 0
+  let totalPositionValue = 0
+  let largestWin = 0
+  let largestLoss = 0
+
+  for (const t of trades) {
+    if (t.profitLoss === 0 && t.isOpen) continue
+
+    closedCount++
+    netProfit += t.profitLoss
+    totalPositionValue += (t.price || 0) * (t.quantity || 0)
+
+    if (t.profitLoss > 0) {
+      profitableCount++
+      totalProfit += t.profitLoss
+      if (t.profitLoss > largestWin) largestWin = t.profitLoss
+    } else if (t.profitLoss < 0) {
+      losingCount++
+      totalLoss -= t.profitLoss
+      if (t.profitLoss < largestLoss) largestLoss = t.profitLoss
+    }
+  }
 
   // Calculate expectancy: (Win Rate × Avg Win) - (Loss Rate × Avg Loss)
-  const winRate = closedTrades.length > 0 ? profitableTrades.length / closedTrades.length : 0
-  const lossRate = closedTrades.length > 0 ? losingTrades.length / closedTrades.length : 0
-  const avgWin = profitableTrades.length > 0 ? totalProfit / profitableTrades.length : 0
-  const avgLoss = losingTrades.length > 0 ? totalLoss / losingTrades.length : 0
+  const winRate = closedCount > 0 ? profitableCount / closedCount : 0
+  const lossRate = closedCount > 0 ? losingCount / closedCount : 0
+  const avgWin = profitableCount > 0 ? totalProfit / profitableCount : 0
+  const avgLoss = losingCount > 0 ? totalLoss / losingCount : 0
   
   const expectancy = (winRate * avgWin) - (lossRate * avgLoss)
   
   // Calculate expectancy as percentage of average position size
-  const avgPositionSize = closedTrades.length > 0 
-    ? closedTrades.reduce((sum, t) => sum + ((t.price || 0) * (t.quantity || 0)), 0) / closedTrades.length
-    : 0
+  const avgPositionSize = closedCount > 0 ? totalPositionValue / closedCount : 0
   const expectancyPercent = avgPositionSize > 0 ? (expectancy / avgPositionSize) * 100 : 0
 
   return {
-    totalTrades: closedTrades.length,
-    profitableTrades: profitableTrades.length,
-    losingTrades: losingTrades.length,
-    netProfit: closedTrades.reduce((sum, t) => sum + t.profitLoss, 0),
+    totalTrades: closedCount,
+    profitableTrades: profitableCount,
+    losingTrades: losingCount,
+    netProfit,
     winRate: winRate * 100,
     averageWin: avgWin,
     averageLoss: avgLoss,
     profitFactor: totalLoss > 0 ? totalProfit / totalLoss : totalProfit > 0 ? Infinity : 0,
-    largestWin: profitableTrades.length > 0 ? Math.max(...profitableTrades.map(t => t.profitLoss)) : 0,
-    largestLoss: losingTrades.length > 0 ? Math.min(...losingTrades.map(t => t.profitLoss)) : 0,
+    largestWin,
+    largestLoss,
     expectancy: expectancy,
     expectancyPercent: expectancyPercent
   }
@@ -303,39 +333,33 @@ const calculateMonthlyPnL = (trades: Trade[], month: number, year: number): Mont
   console.log('Input trades count:', trades.length)
   console.log('Target month:', month, 'Target year:', year)
   
-  const monthlyTrades = trades.filter(trade => {
-    const tradeDate = new Date(trade.date)
-    const tradeMonth = tradeDate.getMonth()
-    const tradeYear = tradeDate.getFullYear()
-    return tradeMonth === month && tradeYear === year
-  })
+  // Single fused pass: filter to the month, keep individual closed trades
+  // (not grouped by symbol) and accumulate their P&L as we go
+  let monthlyTradeCount = 0
+  let closedTradeCount = 0
+  let profitableTrades = 0
+  let losingTrades = 0
+  let totalPnL = 0
 
-  console.log('Monthly trades count:', monthlyTrades.length)
-  
-  // Group trades by symbol to identify completed positions
-  const positionsBySymbol: Record<string, Trade[]> = {}
-  monthlyTrades.forEach(trade => {
-    if (!positionsBySymbol[trade.symbol]) {
-      positionsBySymbol[trade.symbol] = []
-    }
-    positionsBySymbol[trade.symbol].push(trade)
-  })
-  
-  // Calculate individual closed trades (not grouped by symbol)
-  const closedTrades = monthlyTrades.filter(t => !t.isOpen && t.profitLoss !== 0)
-  
   console.log('Individual closed trades:')
-  closedTrades.forEach(trade => {
+  for (const trade of trades) {
+    const tradeDate = new Date(trade.date)
+    if (tradeDate.getMonth() !== month || tradeDate.getFullYear() !== year) continue
+    monthlyTradeCount++
+
+    if (trade.isOpen || trade.profitLoss === 0) continue
+    closedTradeCount++
     console.log(`- ${trade.symbol} on ${trade.date}: P&L ${trade.profitLoss}`)
-  })
-  
-  const profitableTrades = closedTrades.filter(t => t.profitLoss > 0)
-  const losingTrades = closedTrades.filter(t => t.profitLoss < 0)
-  const totalPnL = closedTrades.reduce((sum, t) => sum + t.profitLoss, 0)
 
-  console.log('Individual closed trades count:', closedTrades.length)
-  console.log('Profitable trades:', profitableTrades.length)
-  console.log('Losing trades:', losingTrades.length)
+    totalPnL += trade.profitLoss
+    if (trade.profitLoss > 0) profitableTrades++
+    else if (trade.profitLoss < 0) losingTrades++
+  }
+
+  console.log('Monthly trades count:', monthlyTradeCount)
+  console.log('Individual closed trades count:', closedTradeCount)
+  console.log('Profitable trades:', profitableTrades)
+  console.log('Losing trades:', losingTrades)
   console.log('Total P&L:', totalPnL)
   console.log('=== End Debug ===')
 
@@ -348,10 +372,10 @@ const calculateMonthlyPnL = (trades: Trade[], month: number, year: number): Mont
     month: monthNames[month],
     year,
     totalPnL,
-    profitableTrades: profitableTrades.length,
-    losingTrades: losingTrades.length,
-    totalTrades: closedTrades.length,
-    winRate: closedTrades.length > 0 ? (profitableTrades.length / closedTrades.length) * 100 : 0
+    profitableTrades,
+    losingTrades,
+    totalTrades: closedTradeCount,
+    winRate: closedTradeCount > 0 ? (profitableTrades / closedTradeCount) * 100 : 0
   }
 }
 
@@ -374,33 +398,6 @@ interface CSVTrade {
   notes?: string
 }
 
-interface Trading212Row {
-  Action: string
-  Time: string
-  ISIN: string
-  Ticker: string
-  Name: string
-  Notes: string
-  ID: string
-  'No. of shares': string
-  'Price / share': string
-  'Currency (Price / share)': string
-  'Exchange rate': string
-  Result: string
-  'Currency (Result)': string
-  Total: string
-  'Currency (Total)': string
-  'Withholding tax': string
-  'Currency (Withholding tax)': string
-  'Charge amount': string
-  'Currency (Charge amount)': string
-  'Deposit fee': string
-  'Currency (Deposit fee)': string
-  'Currency conversion fee': string
-  'Currency (Currency conversion fee)': string
-  [key: string]: string // Allow string indexing
-}
-
 const convertToEUR = (amount: number, currency: string, exchangeRate: number): number => {
   // Handle NaN or invalid amounts
   if (isNaN(amount) || amount === null || amount === undefined) {
@@ -423,29 +420,6 @@ const convertToEUR = (amount: number, currency: string, exchangeRate: number): n
   return amount
 }
 
-// Helper function to parse CSV line handling quotes and commas
-const parseCSVLine = (line: string): string[] => {
-  const result: string[] = []
-  let current = ''
-  let inQuotes = false
-  
-  for (let i = 0; i < line.length; i++) {
-    const char = line[i]
-    
-    if (char === '"') {
-      inQuotes = !inQuotes
-    } else if (char === ',' && !inQuotes) {
-      result.push(current.trim())
-      current = ''
-    } else {
-      current += char
-    }
-  }
-  
-  result.push(current.trim())
-  return result
-}
-
 // Trading212 CSV header mapping
 const staticHeaderMap: Record<string, string> = {
   'Action': 'Action',
@@ -467,15 +441,43 @@ const staticHeaderMap: Record<string, string> = {
   'Currency (Currency conversion fee)': 'Currency (Currency conversion fee)'
 }
 
+// Possible variations for each required field, used for flexible header mapping
+const headerVariations: Record<string, string[]> = {
+  'Action': ['Action', 'Type', 'Side', 'Transaction Type', 'Order Type'],
+  'Time': ['Time', 'Date', 'DateTime', 'Timestamp', 'Date/Time', 'Trade Date'],
+  'Ticker': ['Ticker', 'Symbol', 'Stock Symbol', 'Instrument', 'Security'],
+  'No. of shares': ['No. of shares', 'Quantity', 'Shares', 'Amount', 'Qty', 'Volume', 'Units'],
+  'Price / share': ['Price / share', 'Price', 'Unit Price', 'Share Price', 'Price per Share', 'Execution Price'],
+  // Extended analysis fields (optional)
+  'Volume': ['Volume', 'Daily Volume', 'Trade Volume'],
+  'Avg Volume': ['Avg Volume', 'Average Volume', 'Avg Volume (30d)', 'AvgVolume'],
+  '52 Week High': ['52 Week High', '52W High', 'WeekHigh52', 'Year High'],
+  '4 Week Performance': ['4 Week Performance', '4W Perf', 'WeekPerf4', 'Monthly Performance'],
+  'Market Cap': ['Market Cap', 'MarketCap', 'Market Capitalization', 'Mkt Cap'],
+  'Notes': ['Notes', 'Comments', 'Description', 'Memo']
+}
+
+// Lowercased once at module load; headers are matched case-insensitively
+const headerVariationEntries: Array<[string, string[]]> = Object.entries(headerVariations)
+  .map(([standardName, variations]): [string, string[]] => [standardName, variations.map(v => v.toLowerCase())])
+
+const headerSuggestions: Record<string, string> = {
+  'Action': 'Try: Action, Type, Side, Transaction Type, Order Type',
+  'Time': 'Try: Time, Date, DateTime, Timestamp, Date/Time, Trade Date',
+  'Ticker': 'Try: Ticker, Symbol, Stock Symbol, Instrument, Security',
+  'No. of shares': 'Try: Quantity, Shares, Amount, Qty, Volume, Units',
+  'Price / share': 'Try: Price, Unit Price, Share Price, Price per Share, Execution Price'
+}
+
 const parseCSVContent = (content: string): CSVTrade[] => {
   console.log('Starting CSV parsing...')
   console.log('Raw CSV content (first 500 chars):', content.substring(0, 500))
   
-  // Split by line breaks and filter out empty lines
-  const lines = content.trim().split(/\r?\n/).filter(line => line.trim())
+  // Split by line breaks; empty lines are skipped while parsing rows
+  const lines = content.trim().split(/\r?\n/)
   console.log('Total lines found:', lines.length)
   
-  if (lines.length === 0) {
+  if (!lines[0]) {
     throw new Error('CSV file is empty')
   }
   
@@ -489,33 +491,17 @@ const parseCSVContent = (content: string): CSVTrade[] => {
   // Flexible mapping for various CSV formats
   const headerMap: Record<string, string> = {}
   
-  // Define possible variations for each required field
-  const headerVariations: Record<string, string[]> = {
-    'Action': ['Action', 'Type', 'Side', 'Transaction Type', 'Order Type'],
-    'Time': ['Time', 'Date', 'DateTime', 'Timestamp', 'Date/Time', 'Trade Date'],
-    'Ticker': ['Ticker', 'Symbol', 'Stock Symbol', 'Instrument', 'Security'],
-    'No. of shares': ['No. of shares', 'Quantity', 'Shares', 'Amount', 'Qty', 'Volume', 'Units'],
-    'Price / share': ['Price / share', 'Price', 'Unit Price', 'Share Price', 'Price per Share', 'Execution Price'],
-    // Extended analysis fields (optional)
-    'Volume': ['Volume', 'Daily Volume', 'Trade Volume'],
-    'Avg Volume': ['Avg Volume', 'Average Volume', 'Avg Volume (30d)', 'AvgVolume'],
-    '52 Week High': ['52 Week High', '52W High', 'WeekHigh52', 'Year High'],
-    '4 Week Performance': ['4 Week Performance', '4W Perf', 'WeekPerf4', 'Monthly Performance'],
-    'Market Cap': ['Market Cap', 'MarketCap', 'Market Capitalization', 'Mkt Cap'],
-    'Notes': ['Notes', 'Comments', 'Description', 'Memo']
-  }
-  
   headers.forEach((header: string) => {
     const trimmedHeader = header.trim()
     const lowerHeader = trimmedHeader.toLowerCase()
     
     // Check each required field for matches
-    Object.entries(headerVariations).forEach(([standardName, variations]) => {
+    headerVariationEntries.forEach(([standardName, variations]) => {
       if (!headerMap[standardName]) { // Only map if not already found
         const match = variations.find(variation => 
-          variation.toLowerCase() === lowerHeader ||
-          lowerHeader.includes(variation.toLowerCase()) ||
-          variation.toLowerCase().includes(lowerHeader)
+          variation === lowerHeader ||
+          lowerHeader.includes(variation) ||
+          variation.includes(lowerHeader)
         )
         if (match) {
           headerMap[standardName] = header
@@ -544,14 +530,7 @@ const parseCSVContent = (content: string): CSVTrade[] => {
     
     // Provide helpful suggestions
     const suggestions = missingHeaders.map(missing => {
-      const variations = {
-        'Action': 'Try: Action, Type, Side, Transaction Type, Order Type',
-        'Time': 'Try: Time, Date, DateTime, Timestamp, Date/Time, Trade Date',
-        'Ticker': 'Try: Ticker, Symbol, Stock Symbol, Instrument, Security',
-        'No. of shares': 'Try: Quantity, Shares, Amount, Qty, Volume, Units',
-        'Price / share': 'Try: Price, Unit Price, Share Price, Price per Share, Execution Price'
-      }
-      return `${missing}: ${variations[missing as keyof typeof variations] || 'No suggestions available'}`
+      return `${missing}: ${headerSuggestions[missing] || 'No suggestions available'}`
     }).join('\n')
     
     throw new Error(`Missing required headers: [${missingHeaders.map(h => `"${h}"`).join(', ')}]\n\nAvailable headers in your CSV: [${headers.map(h => `"${h}"`).join(', ')}]\n\nSuggested column names:\n${suggestions}`)
@@ -559,12 +538,42 @@ const parseCSVContent = (content: string): CSVTrade[] => {
 
   const trades: CSVTrade[] = []
 
-  lines.slice(1).forEach((line, index) => {
-    // Skip empty lines
-    if (!line.trim()) {
-      console.log(`Skipping empty line at index ${index + 1}`)
-      return
-    }
+  // Resolve column positions once so each row is read by index instead of
+  // being copied into a keyed object (last occurrence wins, as before)
+  const columnIndex = (field: string): number =>
+    headerMap[field] ? headers.lastIndexOf(headerMap[field]) : -1
+  const actionIdx = columnIndex('Action')
+  const tickerIdx = columnIndex('Ticker')
+  const timeIdx = columnIndex('Time')
+  const sharesIdx = columnIndex('No. of shares')
+  const priceIdx = columnIndex('Price / share')
+  const exchangeRateIdx = columnIndex('Exchange rate')
+  const resultIdx = columnIndex('Result')
+  const nameIdx = columnIndex('Name')
+  const priceCurrencyIdx = columnIndex('Currency (Price / share)')
+  const resultCurrencyIdx = columnIndex('Currency (Result)')
+  const volumeIdx = columnIndex('Volume')
+  const avgVolumeIdx = columnIndex('Avg Volume')
+  const weekHigh52Idx = columnIndex('52 Week High')
+  const weekPerf4Idx = columnIndex('4 Week Performance')
+  const marketCapIdx = columnIndex('Market Cap')
+  const notesIdx = columnIndex('Notes')
+
+  console.log('Column indices:', {
+    actionIdx,
+    tickerIdx,
+    timeIdx,
+    sharesIdx,
+    priceIdx
+  })
+
+  // Single pass over the raw lines: blank lines are skipped here instead of
+  // being filtered into a copy first, and rows are numbered as before
+  let index = -1
+  for (let lineNumber = 1; lineNumber < lines.length; lineNumber++) {
+    const line = lines[lineNumber]
+    if (!line.trim()) continue
+    index++
 
     // Parse the line properly
     const values = parseCSVLine(line)
@@ -572,96 +581,32 @@ const parseCSVContent = (content: string): CSVTrade[] => {
       console.log(`Skipping malformed line at index ${index + 1}: values count (${values.length}) != headers count (${headers.length})`)
       console.log('Line:', line)
       console.log('Values:', values)
-      return
+      continue
     }
 
-    // Create row object with original headers (not mapped)
-    const row = headers.reduce((obj: any, header: string, index: number) => {
-      obj[header] = values[index] || ''
-      return obj
-    }, {}) as Trading212Row
-
-    console.log(`Processing row ${index + 1}:`, row)
-
-    // Log the raw row data
-    console.log(`Raw row data for index ${index + 1}:`, row)
-
-    // Log the raw row data
-    console.log(`Raw row data for index ${index + 1}:`, row)
-
-    // Process all trades that have the required fields using mapped headers
-    const actionField = headerMap['Action']
-    const tickerField = headerMap['Ticker']
-    const timeField = headerMap['Time']
-    const sharesField = headerMap['No. of shares']
-    const priceField = headerMap['Price / share']
-    
-    console.log('Field mapping check:', {
-      actionField,
-      tickerField,
-      timeField,
-      sharesField,
-      priceField,
-      actionValue: row[actionField],
-      tickerValue: row[tickerField],
-      timeValue: row[timeField],
-      sharesValue: row[sharesField],
-      priceValue: row[priceField]
-    })
-    
-    console.log('Price field debugging:', {
-      priceField,
-      priceFieldExists: priceField !== undefined,
-      priceValue: row[priceField],
-      priceValueExists: row[priceField] !== undefined && row[priceField] !== '',
-      allRowKeys: Object.keys(row),
-      conditionCheck: {
-        actionField: !!row[actionField],
-        tickerField: !!row[tickerField], 
-        timeField: !!row[timeField],
-        sharesField: !!row[sharesField],
-        priceField: !!row[priceField]
-      }
-    })
-    
-    // Always show detailed field extraction for debugging
-    const sharesStr = (row[sharesField] || '').replace(/[,\s]/g, '')
-    const priceStr = (row[priceField] || '').replace(/[,\s]/g, '')
-    const exchangeRateStr = (row[headerMap['Exchange rate']] || '1').replace(/[,\s]/g, '')
-    const resultStr = (row[headerMap['Result']] || '0').replace(/[,\s]/g, '')
+    const action = values[actionIdx] || ''
+    const ticker = values[tickerIdx] || ''
+    const rawTime = values[timeIdx] || ''
+    const rawShares = values[sharesIdx] || ''
+    const rawPrice = values[priceIdx] || ''
     
     // Only log first 3 rows to avoid console spam
     if (index < 3) {
       console.log(`=== ROW ${index + 1} DEBUG ===`)
+      console.log('Raw values:', values)
       console.log('Raw field values:', {
-        shares: row[sharesField],
-        price: row[priceField],
-        exchangeRate: row[headerMap['Exchange rate']],
-        result: row[headerMap['Result']]
-      })
-      
-      console.log('Cleaned field values:', {
-        sharesStr,
-        priceStr,
-        exchangeRateStr,
-        resultStr
-      })
-      
-      console.log('Field mappings:', {
-        sharesField,
-        priceField,
-        exchangeRateField: headerMap['Exchange rate'],
-        resultField: headerMap['Result']
+        shares: rawShares,
+        price: rawPrice,
+        exchangeRate: values[exchangeRateIdx],
+        result: values[resultIdx]
       })
     }
     
-    if (row[actionField] && row[tickerField] && row[timeField] && row[sharesField]) {
-      console.log(`Processing trade for row ${index + 1}`)
-
-      const shares = parseFloat(sharesStr) || 0
-      const price = parseFloat(priceStr) || 0
-      const exchangeRate = parseFloat(exchangeRateStr) || 1
-      const result = parseFloat(resultStr) || 0
+    if (action && ticker && rawTime && rawShares) {
+      const shares = parseNumericField(rawShares) || 0
+      const price = parseNumericField(rawPrice) || 0
+      const exchangeRate = parseNumericField(values[exchangeRateIdx]) || 1
+      const result = parseNumericField(values[resultIdx]) || 0
 
       // Only log first 3 rows to avoid spam
       if (index < 3) {
@@ -674,8 +619,8 @@ const parseCSVContent = (content: string): CSVTrade[] => {
       }
 
       // Get currency information from CSV
-      const priceCurrency = row[headerMap['Currency (Price / share)']] || 'EUR'
-      const resultCurrency = row[headerMap['Currency (Result)']] || 'EUR'
+      const priceCurrency = values[priceCurrencyIdx] || 'EUR'
+      const resultCurrency = values[resultCurrencyIdx] || 'EUR'
       
       // Convert to EUR if needed
       const priceInEUR = convertToEUR(price, priceCurrency, exchangeRate)
@@ -691,42 +636,41 @@ const parseCSVContent = (content: string): CSVTrade[] => {
       // Parse date with better error handling
       let parsedDate: string;
       try {
-        const rawDate = row[timeField];
         // Handle various date formats:
         // - "2026-01-02;072229" (IBKR with semicolon)
         // - "2026-01-02" (standard)
         // - "01/02/2026" (US format)
-        let dateStr = rawDate;
-        if (rawDate.includes(';')) {
+        let dateStr = rawTime;
+        if (rawTime.includes(';')) {
           // IBKR format: "2026-01-02;072229" -> "2026-01-02"
-          dateStr = rawDate.split(';')[0];
+          dateStr = rawTime.split(';')[0];
         }
         const dateObj = new Date(dateStr);
         if (isNaN(dateObj.getTime())) {
-          throw new Error(`Invalid date: ${rawDate}`);
+          throw new Error(`Invalid date: ${rawTime}`);
         }
         parsedDate = dateObj.toISOString().split('T')[0];
       } catch (error) {
-        console.error(`Failed to parse date at row ${index + 1}:`, row[timeField], error);
-        throw new Error(`Invalid date format in row ${index + 1}: "${row[timeField]}". Expected format: YYYY-MM-DD or MM/DD/YYYY`);
+        console.error(`Failed to parse date at row ${index + 1}:`, rawTime, error);
+        throw new Error(`Invalid date format in row ${index + 1}: "${rawTime}". Expected format: YYYY-MM-DD or MM/DD/YYYY`);
       }
 
       // Create CSVTrade object with all required fields
       const trade: CSVTrade = {
-        action: row[actionField].toLowerCase(),
-        ticker: row[tickerField],
+        action: action.toLowerCase(),
+        ticker,
         date: parsedDate,
-        name: row[headerMap['Name']] || '',
+        name: values[nameIdx] || '',
         shares: shares,
         price: priceInEUR,
         result: resultInEUR,
         // Extended analysis fields (optional)
-        volume: headerMap['Volume'] ? parseFloat((row[headerMap['Volume']] || '').replace(/[,\s]/g, '')) || undefined : undefined,
-        avgVolume: headerMap['Avg Volume'] ? parseFloat((row[headerMap['Avg Volume']] || '').replace(/[,\s]/g, '')) || undefined : undefined,
-        weekHigh52: headerMap['52 Week High'] ? parseFloat((row[headerMap['52 Week High']] || '').replace(/[,\s]/g, '')) || undefined : undefined,
-        weekPerf4: headerMap['4 Week Performance'] ? parseFloat((row[headerMap['4 Week Performance']] || '').replace(/[,\s]/g, '')) || undefined : undefined,
-        marketCap: headerMap['Market Cap'] ? parseFloat((row[headerMap['Market Cap']] || '').replace(/[,\s]/g, '')) || undefined : undefined,
-        notes: headerMap['Notes'] ? row[headerMap['Notes']] || undefined : undefined
+        volume: volumeIdx >= 0 ? parseNumericField(values[volumeIdx]) || undefined : undefined,
+        avgVolume: avgVolumeIdx >= 0 ? parseNumericField(values[avgVolumeIdx]) || undefined : undefined,
+        weekHigh52: weekHigh52Idx >= 0 ? parseNumericField(values[weekHigh52Idx]) || undefined : undefined,
+        weekPerf4: weekPerf4Idx >= 0 ? parseNumericField(values[weekPerf4Idx]) || undefined : undefined,
+        marketCap: marketCapIdx >= 0 ? parseNumericField(values[marketCapIdx]) || undefined : undefined,
+        notes: notesIdx >= 0 ? values[notesIdx] || undefined : undefined
       }
 
       if (index < 3) {
@@ -735,25 +679,32 @@ const parseCSVContent = (content: string): CSVTrade[] => {
       trades.push(trade)
     } else {
       console.log(`Skipping row ${index + 1} - missing required fields:`, {
-        hasAction: !!row[actionField],
-        hasTicker: !!row[tickerField],
-        hasTime: !!row[timeField],
-        hasShares: !!row[sharesField],
-        actionValue: row[actionField],
-        tickerValue: row[tickerField],
-        timeValue: row[timeField],
-        sharesValue: row[sharesField]
+        actionValue: action,
+        tickerValue: ticker,
+        timeValue: rawTime,
+        sharesValue: rawShares
       })
     }
-  })
+  }
 
   console.log('Parsed trades:', trades)
   return trades
 }
 
-const validateTradeData = (trade: CSVTrade): void => {
-  console.log('Validating trade:', JSON.stringify(trade, null, 2))
+// Known Trading212 action types (lowercased), built once for O(1) lookups
+const validActions = new Set([
+  'market buy', 'limit sell', 'market sell', 'limit buy',
+  'stop limit sell', 'stop limit buy', 'stop sell', 'stop buy',
+  'dividend (dividend)', 'dividend', 
+  'stock split', 'stock split close', 'stock dividend',
+  'currency conversion', 'deposit', 'withdrawal',
+  'interest on cash', 'lending interest',
+  'corporate action', 'rights issue', 'spin-off'
+])
+
+const requiredFields = ['ticker', 'date', 'shares', 'price', 'action']
 
+const validateTradeData = (trade: CSVTrade): void => {
   // Check if trade object exists
   if (!trade || typeof trade !== 'object') {
     console.error('Invalid trade data (null or not an object):', trade)
@@ -761,7 +712,6 @@ const validateTradeData = (trade: CSVTrade): void => {
   }
 
   // Check required fields
-  const requiredFields = ['ticker', 'date', 'shares', 'price', 'action']
   const missingFields = requiredFields.filter(field => {
     const value = trade[field as keyof CSVTrade]
     return value === undefined || value === null || value === ''
@@ -797,23 +747,11 @@ const validateTradeData = (trade: CSVTrade): void => {
   }
 
   // Validate action type - be more flexible for Trading212 action types
-  const validActions = [
-    'market buy', 'limit sell', 'market sell', 'limit buy',
-    'stop limit sell', 'stop limit buy', 'stop sell', 'stop buy',
-    'dividend (dividend)', 'dividend', 
-    'stock split', 'stock split close', 'stock dividend',
-    'currency conversion', 'deposit', 'withdrawal',
-    'interest on cash', 'lending interest',
-    'corporate action', 'rights issue', 'spin-off'
-  ]
-  
   // For now, just log unknown action types but don't fail - Trading212 has many action types
-  if (!validActions.includes(trade.action)) {
+  if (!validActions.has(trade.action)) {
     console.warn('Unknown action type (allowing anyway):', trade.action)
-    console.log('Known actions are:', validActions)
+    console.log('Known actions are:', Array.from(validActions))
   }
-
-  console.log('Trade validation passed:', JSON.stringify(trade, null, 2))
 }
 
 export const useTradeStore = create<TradeStore>((set, get) => ({
@@ -974,8 +912,14 @@ export const useTradeStore = create<TradeStore>((set, get) => ({
       
       // Detect broker from CSV content
       const detectBroker = (csvContent: string): string => {
-        const lowerContent = csvContent.toLowerCase()
-        const firstLines = csvContent.split('\n').slice(0, 5).join('\n').toLowerCase()
+        // Only the first few lines are copied and lowercased; the broker name
+        // search scans the full content in place
+        let headEnd = -1
+        for (let i = 0; i < 5; i++) {
+          headEnd = csvContent.indexOf('\n', headEnd + 1)
+          if (headEnd === -1) break
+        }
+        const firstLines = (headEnd === -1 ? csvContent : csvContent.substring(0, headEnd)).toLowerCase()
         
         // Trading 212 detection
         if (firstLines.includes('action') && firstLines.includes('time') && 
@@ -985,8 +929,7 @@ export const useTradeStore = create<TradeStore>((set, get) => ({
         }
         
         // Interactive Brokers detection
-        if (firstLines.includes('trades') || lowerContent.includes('ibkr') || 
-            lowerContent.includes('interactive brokers') ||
+        if (firstLines.includes('trades') || /ibkr|interactive brokers/i.test(csvContent) ||
             (firstLines.includes('symbol') && firstLines.includes('date/time') && firstLines.includes('quantity'))) {
           console.log('Detected broker: InteractiveBrokers')
           return 'InteractiveBrokers'
@@ -1010,13 +953,21 @@ export const useTradeStore = create<TradeStore>((set, get) => ({
       console.log('Parsed trades:', parsedTrades)
       const trades: Trade[] = []
 
+      // Per-import constants, computed once instead of for every row
+      const importedAt = new Date().toISOString()
+      const actionSlugs = new Map<string, string>()
+
       parsedTrades.forEach((trade, index) => {
         try {
-          console.log('Processing trade:', JSON.stringify(trade, null, 2))
           validateTradeData(trade)
 
           // Create unique sourceId using date, ticker, shares, action, and index to handle multiple trades
-          const uniqueId = `${trade.date}-${trade.ticker}-${trade.shares}-${trade.action.replace(/\s+/g, '-')}-${index}`
+          let actionSlug = actionSlugs.get(trade.action)
+          if (actionSlug === undefined) {
+            actionSlug = trade.action.replace(/\s+/g, '-')
+            actionSlugs.set(trade.action, actionSlug)
+          }
+          const uniqueId = `${trade.date}-${trade.ticker}-${trade.shares}-${actionSlug}-${index}`
           
           // Create a trade for every action (both buy and sell)
           const newTrade: Trade = {
@@ -1041,11 +992,10 @@ export const useTradeStore = create<TradeStore>((set, get) => ({
               tags: [],
               emotion: 'neutral',
               rating: 3,
-              createdAt: new Date().toISOString(),
+              createdAt: importedAt,
             },
           }
 
-          console.log('Created new trade:', JSON.stringify(newTrade, null, 2))
           trades.push(newTrade)
         } catch (tradeError) {
           console.error('Error processing individual trade:', tradeError)